@@ -1,38 +1,25 @@
 import os
-import math
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager, suppress
 import urllib.request
 import torch
 import torch.nn as nn
-from typing import Optional
-from transformers import T5Tokenizer, T5ForConditionalGeneration
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Literal, Optional
+from transformers import T5TokenizerFast, T5ForConditionalGeneration
+from transformers.modeling_outputs import BaseModelOutput
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class CustomEncoderDecoderSummarizer(nn.Module):
-    def __init__(self, pretrained_model_name="t5-base", d_model=768):
+    def __init__(self, t5_model: T5ForConditionalGeneration, d_model=768):
         super().__init__()
-        from transformers import T5ForConditionalGeneration
-        self.t5 = T5ForConditionalGeneration.from_pretrained(pretrained_model_name)
-        self.encoder = self.t5.encoder
-        self.decoder = self.t5.decoder
+        self.t5 = t5_model
         self.d_model = d_model
-        self.fc = nn.Linear(self.encoder.config.d_model, d_model)
-        self.positional_encoding = self._get_positional_encoding(d_model)
-
-    def _get_positional_encoding(self, d_model, max_len=512):
-        pos_encoding = torch.zeros(max_len, d_model)
-        for pos in range(max_len):
-            for i in range(0, d_model, 2):
-                pos_encoding[pos, i] = math.sin(pos / (10000 ** (i / d_model)))
-                if i + 1 < d_model:
-                    pos_encoding[pos, i + 1] = math.cos(pos / (10000 ** (i / d_model)))
-        return pos_encoding
 
     def forward(self, input_ids, decoder_input_ids=None, attention_mask=None, labels=None):
-        encoder_outputs = self.encoder(input_ids=input_ids, attention_mask=attention_mask)
-        encoder_hidden_states = encoder_outputs.last_hidden_state
-        # You commented out positional encoding usage during training, so no need here
         return self.t5(
             input_ids=input_ids,
             attention_mask=attention_mask,
@@ -40,6 +27,15 @@ class CustomEncoderDecoderSummarizer(nn.Module):
             decoder_input_ids=decoder_input_ids
         )
 
+class EncoderForTracing(nn.Module):
+    """T5 encoder returning a bare tensor, so it can be traced with torch.jit.trace."""
+    def __init__(self, encoder):
+        super().__init__()
+        self.encoder = encoder
+
+    def forward(self, input_ids, attention_mask):
+        return self.encoder(input_ids=input_ids, attention_mask=attention_mask, return_dict=False)[0]
+
 """Summarization FastAPI server (T5)
 - Loads base T5 model; optionally loads fine-tuned weights from MODEL_PATH.
 - If MODEL_URL is set and MODEL_PATH is missing, downloads weights at startup.
@@ -48,9 +44,36 @@ class CustomEncoderDecoderSummarizer(nn.Module):
 
 # Setup device
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+# Half precision on GPU; prefer bf16 on Ampere+ (native bf16) since T5 activations can overflow
+# fp16. Older cards only emulate bf16, which is slower than fp32, so they get fp16.
+half_dtype = torch.bfloat16 if device.type == "cuda" and torch.cuda.get_device_capability(device)[0] >= 8 else torch.float16
+
+if device.type == "cuda":
+    # Let any remaining fp32 matmuls (and compiled Triton GEMMs) use TF32 tensor cores
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.backends.cudnn.benchmark = True
+    torch.set_float32_matmul_precision("high")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load and warm up the model on the generation thread, run the batch worker, then clean up."""
+    global summary_queue, batch_worker_task
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(generation_executor, load_model)
+    await loop.run_in_executor(generation_executor, warm_up)
+    summary_queue = asyncio.Queue()
+    batch_worker_task = asyncio.create_task(batch_worker())
+    try:
+        yield
+    finally:
+        batch_worker_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await batch_worker_task
+        generation_executor.shutdown(wait=False, cancel_futures=True)
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # CORS
 frontend_origin = os.environ.get("FRONTEND_ORIGIN", "*")
@@ -65,28 +88,6 @@ app.add_middleware(
 # Check if we should use a simple model (faster but lower quality)
 USE_SIMPLE_MODEL = True
 
-# Initialize tokenizer and base model
-try:
-    print("Loading tokenizer...")
-    tokenizer = T5Tokenizer.from_pretrained("t5-small" if USE_SIMPLE_MODEL else "t5-base")
-    print("Successfully loaded T5Tokenizer")
-
-    print("Loading model...")
-    base_model_name = "t5-small" if USE_SIMPLE_MODEL else "t5-base"
-    base_model = T5ForConditionalGeneration.from_pretrained(base_model_name)
-    base_model.eval()
-    print("Base T5 model loaded successfully")
-except Exception as e:
-    print(f"Error loading base model/tokenizer: {str(e)}")
-    from transformers import AutoTokenizer
-    tokenizer = AutoTokenizer.from_pretrained("t5-base", use_fast=True)
-    base_model = T5ForConditionalGeneration.from_pretrained("t5-base")
-    base_model.eval()
-    print("Using AutoTokenizer and base T5 as fallback")
-
-# Wrap base model in our custom module and try to load fine-tuned weights
-model = CustomEncoderDecoderSummarizer(pretrained_model_name="t5-base").to(device)
-
 # Resolve model path under project root unless MODEL_PATH is provided
 # Prefer a model inside the backend folder by default (user provided path)
 default_model_path = os.path.join(os.path.dirname(__file__), "model_weight.pth")
@@ -103,25 +104,323 @@ def ensure_weights(path: str, url: Optional[str]) -> None:
         except Exception as e:
             print(f"Failed to download weights: {e}")
 
-ensure_weights(model_path, model_url)
+def cpu_has_vnni() -> bool:
+    """True if the CPU advertises AVX-512 VNNI / AVX-VNNI int8 dot-product instructions."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_vnni" in flags or "avx_vnni" in flags
+
+# Populated once by load_model() from the lifespan hook, not at import time. Run the server
+# with a single worker (uvicorn --workers 1) so only one copy of the weights is resident;
+# scale out with more containers, and let request batching soak up concurrency.
+tokenizer = None
+model = None
+ort_model = None
+USE_TORCH_COMPILE = False
+USE_TRACED_ENCODER = False
+# Cleared by warm_up() if greedy_decode() disagrees with generate(); num_beams=1 then uses generate()
+USE_GREEDY_LOOP = True
+PREFIX_IDS = []
+# Most recently used traced encoders, keyed on (batch, padded length)
+traced_encoders = OrderedDict()
+MAX_TRACED_ENCODERS = 8
+
+def load_model() -> None:
+    global tokenizer, model, ort_model, USE_TORCH_COMPILE, USE_TRACED_ENCODER, PREFIX_IDS
 
-if os.path.exists(model_path):
+    # Initialize tokenizer and base model
     try:
-        model.load_state_dict(torch.load(model_path, map_location=device))
-        print(f"Loaded fine-tuned weights from: {model_path}")
+        print("Loading tokenizer...")
+        tokenizer = T5TokenizerFast.from_pretrained("t5-small" if USE_SIMPLE_MODEL else "t5-base")
+        print("Successfully loaded T5TokenizerFast")
+
+        print("Loading model...")
+        # The fine-tuned checkpoint and the wrapper (d_model=768) are t5-base shaped
+        base_model_name = "t5-base"
+        base_model = T5ForConditionalGeneration.from_pretrained(base_model_name)
+        base_model.eval()
+        print("Base T5 model loaded successfully")
     except Exception as e:
-        print(f"Failed to load fine-tuned weights from '{model_path}': {e}")
-        print("Continuing with base T5 weights.")
-else:
-    print(f"Model weights not found at '{model_path}'. Continuing with base T5 weights (no fine-tuned checkpoint).")
+        print(f"Error loading base model/tokenizer: {str(e)}")
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained("t5-base", use_fast=True)
+        base_model = T5ForConditionalGeneration.from_pretrained("t5-base")
+        base_model.eval()
+        print("Using AutoTokenizer and base T5 as fallback")
+
+    PREFIX_IDS = tokenizer("summarize:", add_special_tokens=False).input_ids
+
+    # Wrap the already-loaded base model in our custom module and try to load fine-tuned weights.
+    # Stays on CPU until the checkpoint is assigned so the weights are only moved to the device once.
+    model = CustomEncoderDecoderSummarizer(base_model)
+
+    ensure_weights(model_path, model_url)
+
+    if os.path.exists(model_path):
+        try:
+            try:
+                state_dict = torch.load(model_path, map_location="cpu", mmap=True, weights_only=True)
+            except RuntimeError:
+                # Legacy (non-zipfile) checkpoints can't be memory-mapped
+                state_dict = torch.load(model_path, map_location="cpu", weights_only=True)
+            # strict=False: older checkpoints still carry the removed fc/encoder/decoder keys.
+            # assign=True adopts the loaded tensors instead of copying them into the base weights.
+            missing, _ = model.load_state_dict(state_dict, strict=False, assign=True)
+            model.t5.tie_weights()
+            if missing:
+                print(f"Checkpoint is missing {len(missing)} keys; those keep their base T5 values.")
+            print(f"Loaded fine-tuned weights from: {model_path}")
+        except Exception as e:
+            print(f"Failed to load fine-tuned weights from '{model_path}': {e}")
+            print("Continuing with base T5 weights.")
+    else:
+        print(f"Model weights not found at '{model_path}'. Continuing with base T5 weights (no fine-tuned checkpoint).")
+
+    model.eval()
+    # Inference-only service: no autograd bookkeeping anywhere
+    torch.set_grad_enabled(False)
+    for param in model.parameters():
+        param.requires_grad_(False)
+
+    # Optional ONNX Runtime backend (needs optimum[onnxruntime] or optimum[onnxruntime-gpu]).
+    # Exported from the fine-tuned fp32 weights while the model is still on CPU. If ONNX_EXPORT_DIR
+    # already holds an export it is reused as-is (clear it after changing the checkpoint).
+    if os.environ.get("USE_ONNXRUNTIME", "0") == "1":
+        try:
+            import tempfile
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+            export_dir = os.environ.get("ONNX_EXPORT_DIR")
+            ort_kwargs = dict(
+                provider="CUDAExecutionProvider" if device.type == "cuda" else "CPUExecutionProvider",
+                use_io_binding=device.type == "cuda",
+            )
+            if export_dir and os.path.exists(os.path.join(export_dir, "encoder_model.onnx")):
+                ort_model = ORTModelForSeq2SeqLM.from_pretrained(export_dir, **ort_kwargs)
+                print(f"Loaded ONNX Runtime model from {export_dir}")
+            else:
+                # The PyTorch checkpoint is only staged for the export, then removed
+                with tempfile.TemporaryDirectory(prefix="talqs-t5-") as staging_dir:
+                    model.t5.save_pretrained(staging_dir)
+                    tokenizer.save_pretrained(staging_dir)
+                    ort_model = ORTModelForSeq2SeqLM.from_pretrained(staging_dir, export=True, **ort_kwargs)
+                if export_dir:
+                    ort_model.save_pretrained(export_dir)
+                print("Exported model to ONNX Runtime" + (f" ({export_dir})" if export_dir else ""))
+        except Exception as e:
+            print(f"ONNX Runtime export failed, using PyTorch model: {e}")
+            ort_model = None
+
+    if ort_model is not None:
+        # ORT serves every request; release the PyTorch weights instead of moving them to the device
+        model = None
+        return
+
+    model.to(device)
+    if device.type == "cuda":
+        model.to(dtype=half_dtype)
+        print(f"Running model in {half_dtype}")
+    elif os.environ.get("QUANTIZE_CPU", "1") == "1" and cpu_has_vnni():
+        # Dynamic int8 quantization of the Linear layers; only on VNNI CPUs, where it is a win
+        try:
+            torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+            print("Applied dynamic int8 quantization (CPU with VNNI)")
+        except Exception as e:
+            print(f"Dynamic quantization failed, keeping fp32 model: {e}")
+
+    # Compile the T5 forward pass; generate() calls self(...) so patching forward is what takes effect.
+    # Default mode, not "reduce-overhead": without a static KV cache the past length changes every
+    # decode step, and CUDA graphs would record (and keep) a new graph for each of those shapes.
+    USE_TORCH_COMPILE = (
+        os.environ.get("TORCH_COMPILE", "1") == "1"
+        and device.type == "cuda"
+        and hasattr(torch, "compile")
+    )
+    if USE_TORCH_COMPILE:
+        try:
+            model.t5.forward = torch.compile(model.t5.forward, mode="default", fullgraph=False, dynamic=True)
+            print("Compiled T5 forward with torch.compile")
+        except Exception as e:
+            print(f"torch.compile unavailable, running eagerly: {e}")
+            USE_TORCH_COMPILE = False
 
-model.eval()
+    # Opt-in (TRACE_ENCODER=1) when torch.compile is off: the encoder is traced and frozen once per
+    # padded input shape. Each new shape costs a trace on the request path and inputs get padded
+    # to the length buckets, so it only pays off for steady, repetitive traffic.
+    USE_TRACED_ENCODER = not USE_TORCH_COMPILE and os.environ.get("TRACE_ENCODER", "0") == "1"
+
+def run_encoder(input_ids, attention_mask) -> BaseModelOutput:
+    global USE_TRACED_ENCODER
+    if USE_TRACED_ENCODER:
+        key = tuple(input_ids.shape)
+        encoder = traced_encoders.get(key)
+        if encoder is not None:
+            traced_encoders.move_to_end(key)
+        else:
+            try:
+                # Trace outside inference mode so the graph doesn't capture inference tensors
+                with torch.inference_mode(False), torch.no_grad():
+                    example = (input_ids.clone(), attention_mask.clone())
+                    traced = torch.jit.trace(EncoderForTracing(model.t5.get_encoder()).eval(), example)
+                    encoder = traced_encoders[key] = torch.jit.freeze(traced)
+                if len(traced_encoders) > MAX_TRACED_ENCODERS:
+                    traced_encoders.popitem(last=False)
+                print(f"Traced encoder for input shape {key}")
+            except Exception as e:
+                print(f"Encoder tracing failed, running eagerly: {e}")
+                USE_TRACED_ENCODER = False
+        if encoder is not None:
+            return BaseModelOutput(last_hidden_state=encoder(input_ids, attention_mask))
+    return model.t5.get_encoder()(input_ids=input_ids, attention_mask=attention_mask)
 
 # Pydantic model for request body validation
 class SummaryRequest(BaseModel):
     text: str
     max_length: Optional[int] = 150
     min_length: Optional[int] = 30
+    num_beams: int = Field(2, ge=1, le=8)
+    # "fast" switches to greedy decoding (num_beams=1) for latency-sensitive callers
+    mode: Optional[Literal["fast"]] = None
+
+# Micro-batching: concurrent requests arriving within BATCH_WAIT_MS are coalesced
+# into one padded generate() call (grouped by their generation settings)
+MAX_BATCH = int(os.environ.get("SUMMARY_MAX_BATCH", "8"))
+BATCH_WAIT_MS = int(os.environ.get("SUMMARY_BATCH_WAIT_MS", "10"))
+summary_queue: Optional[asyncio.Queue] = None
+batch_worker_task: Optional[asyncio.Task] = None
+# All model work (loading, warm-up, every generate call) runs on this one thread: compiled
+# and traced state is per-thread, and so is the grad mode that load_model() switches off
+generation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+
+# The "summarize:" task prefix is tokenized once (PREFIX_IDS, set in load_model) and
+# prepended to every request
+MAX_INPUT_LENGTH = 512
+# With a traced encoder, pad to a few fixed widths so only a handful of input shapes get
+# traced. The compiled path runs the encoder eagerly (and compiles with dynamic=True), so
+# there padding would only add encoder and cross-attention work.
+LENGTH_BUCKETS = (64, 128, 256, MAX_INPUT_LENGTH)
+
+def padded_length(length: int) -> int:
+    if not USE_TRACED_ENCODER:
+        return length
+    return next(bucket for bucket in LENGTH_BUCKETS if bucket >= length)
+
+def encode_batch(texts: List[str]):
+    """Build padded input_ids/attention_mask for texts, prefixed and EOS-terminated."""
+    body_ids = tokenizer(texts,
+                         add_special_tokens=False,
+                         max_length=MAX_INPUT_LENGTH - len(PREFIX_IDS) - 1,
+                         truncation=True).input_ids
+    sequences = [PREFIX_IDS + ids + [tokenizer.eos_token_id] for ids in body_ids]
+
+    width = padded_length(max(len(seq) for seq in sequences))
+    input_ids = torch.full((len(sequences), width), tokenizer.pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(sequences), width), dtype=torch.long)
+    for row, seq in enumerate(sequences):
+        input_ids[row, :len(seq)] = torch.tensor(seq, dtype=torch.long)
+        attention_mask[row, :len(seq)] = 1
+
+    if device.type == "cuda":
+        input_ids, attention_mask = input_ids.pin_memory(), attention_mask.pin_memory()
+    return input_ids.to(device, non_blocking=True), attention_mask.to(device, non_blocking=True)
+
+def greedy_decode(encoder_outputs, attention_mask, max_length: int, min_length: int) -> torch.Tensor:
+    """Greedy decoding that drives the decoder directly with its KV cache (num_beams=1 hot path)."""
+    config = model.t5.config
+    max_length = max_length or model.t5.generation_config.max_length
+    min_length = min_length or 0
+    batch_size = attention_mask.shape[0]
+    tokens = torch.full((batch_size, 1), config.decoder_start_token_id, dtype=torch.long, device=attention_mask.device)
+    finished = torch.zeros(batch_size, dtype=torch.bool, device=attention_mask.device)
+    past_key_values = None
+
+    # Same length semantics as generate(): both limits count the decoder start token
+    while tokens.shape[1] < max_length:
+        outputs = model.t5(
+            encoder_outputs=encoder_outputs,
+            attention_mask=attention_mask,
+            decoder_input_ids=tokens[:, -1:],
+            past_key_values=past_key_values,
+            use_cache=True,
+        )
+        past_key_values = outputs.past_key_values
+        logits = outputs.logits[:, -1, :]
+        if tokens.shape[1] < min_length:
+            logits[:, config.eos_token_id] = float("-inf")
+
+        next_tokens = logits.argmax(dim=-1).masked_fill(finished, config.pad_token_id)
+        tokens = torch.cat([tokens, next_tokens[:, None]], dim=1)
+        finished |= next_tokens == config.eos_token_id
+        if finished.all():
+            break
+
+    return tokens
+
+def generate_summaries(texts: List[str], max_length: int, min_length: int, num_beams: int) -> List[str]:
+    input_ids, attention_mask = encode_batch(texts)
+
+    generation_kwargs = dict(
+        max_length=max_length,
+        min_length=min_length,
+        do_sample=False,
+        num_beams=num_beams
+    )
+    if num_beams > 1:
+        generation_kwargs.update(length_penalty=2.0, early_stopping=True)
+
+    if ort_model is not None:
+        summary_ids = ort_model.generate(input_ids=input_ids, attention_mask=attention_mask, **generation_kwargs)
+    else:
+        # Encode once up front and hand the result to generate(); the decoder reuses it
+        # for every beam and step, and its own KV cache via use_cache
+        with torch.inference_mode(), torch.autocast(device_type=device.type, dtype=half_dtype, enabled=device.type == "cuda"):
+            encoder_outputs = run_encoder(input_ids, attention_mask)
+            if num_beams == 1 and USE_GREEDY_LOOP:
+                summary_ids = greedy_decode(encoder_outputs, attention_mask, max_length, min_length)
+            else:
+                summary_ids = model.t5.generate(
+                    encoder_outputs=encoder_outputs,
+                    attention_mask=attention_mask,
+                    use_cache=True,
+                    **generation_kwargs
+                )
+
+    return tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+
+async def batch_worker():
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await summary_queue.get()]
+        deadline = loop.time() + BATCH_WAIT_MS / 1000
+        while len(batch) < MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(summary_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        groups = {}
+        for text, max_length, min_length, num_beams, future in batch:
+            groups.setdefault((max_length, min_length, num_beams), []).append((text, future))
+
+        for (max_length, min_length, num_beams), items in groups.items():
+            try:
+                # Tokenize/generate/decode on the generation thread so the event loop keeps
+                # accepting requests (which queue up for the next batch meanwhile)
+                summaries = await loop.run_in_executor(
+                    generation_executor, generate_summaries, [text for text, _ in items], max_length, min_length, num_beams
+                )
+                for (_, future), summary in zip(items, summaries):
+                    if not future.done():
+                        future.set_result(summary)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
 
 @app.post("/summarize")
 async def summarize(request: SummaryRequest):
@@ -131,24 +430,12 @@ async def summarize(request: SummaryRequest):
             
         print(f"Received summarization request (text length: {len(request.text)})")
         
-        # Tokenize input text with a summarization prefix
-        inputs = tokenizer("summarize: " + request.text, 
-                         return_tensors="pt", 
-                         max_length=512, 
-                         truncation=True)
-        
-        # Generate summary
-        summary_ids = model.t5.generate(
-            inputs.input_ids.to(device),
-            max_length=request.max_length,
-            min_length=request.min_length,
-            length_penalty=2.0,
-            num_beams=4,
-            early_stopping=True
-        )
-        
-        # Decode and return summary
-        summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+        num_beams = 1 if request.mode == "fast" else request.num_beams
+
+        # Queue the request for the batch worker and wait for its summary
+        future = asyncio.get_running_loop().create_future()
+        await summary_queue.put((request.text, request.max_length, request.min_length, num_beams, future))
+        summary = await future
         print(f"Generated summary (length: {len(summary)})")
         return {"summary": summary}
         
@@ -162,6 +449,57 @@ async def summarize(request: SummaryRequest):
             summary = request.text
         return {"summary": summary, "warning": "Using fallback summarization"}
 
+def greedy_matches_generate() -> bool:
+    """Check greedy_decode() against generate(num_beams=1) on a padded batch with a min_length."""
+    texts = [
+        "warm up",
+        "The appellant challenged the order of the High Court, arguing that the tribunal had "
+        "ignored material evidence. The court dismissed the appeal and upheld the findings.",
+    ]
+    input_ids, attention_mask = encode_batch(texts)
+    with torch.inference_mode(), torch.autocast(device_type=device.type, dtype=half_dtype, enabled=device.type == "cuda"):
+        encoder_outputs = run_encoder(input_ids, attention_mask)
+        # min_length forces EOS suppression on the short row, which is also padded
+        ours = greedy_decode(encoder_outputs, attention_mask, max_length=24, min_length=12)
+        reference = model.t5.generate(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            max_length=24,
+            min_length=12,
+            num_beams=1,
+            do_sample=False,
+        )
+    return tokenizer.batch_decode(ours, skip_special_tokens=True) == tokenizer.batch_decode(reference, skip_special_tokens=True)
+
+def warm_up():
+    """Run tiny generations so the first request doesn't pay compile/trace/autotune cost."""
+    global USE_GREEDY_LOOP, USE_TORCH_COMPILE
+    try:
+        print("Warming up model...")
+        generate_summaries(["warm up"], max_length=8, min_length=0, num_beams=2)
+        print("Warm-up complete")
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+        if USE_TORCH_COMPILE:
+            # torch.compile is lazy, so Inductor/Triton failures first surface here. Go back to the
+            # eager forward rather than failing every request for the life of the process.
+            print("Disabling torch.compile and retrying warm-up eagerly")
+            del model.t5.forward
+            torch._dynamo.reset()
+            USE_TORCH_COMPILE = False
+            warm_up()
+            return
+
+    if ort_model is None:
+        # Also warms the greedy (num_beams=1) path
+        try:
+            USE_GREEDY_LOOP = greedy_matches_generate()
+        except Exception as e:
+            print(f"Greedy parity check failed: {e}")
+            USE_GREEDY_LOOP = False
+        if not USE_GREEDY_LOOP:
+            print("greedy_decode did not match generate(); using generate() for num_beams=1")
+
 # Health endpoint
 @app.get("/health")
 def health():
@@ -173,4 +511,5 @@ if __name__ == "__main__":
     port = int(os.environ.get("PORT", "8001"))
     print(f"Starting summarization server on port {port}...")
     print(f"Using {'simple' if USE_SIMPLE_MODEL else 'full'} model")
-    uvicorn.run(app, host="0.0.0.0", port=port, log_level="info")
\ No newline at end of file
+    # One worker: the model is loaded per process, so extra workers would each hold a copy
+    uvicorn.run(app, host="0.0.0.0", port=port, log_level="info", workers=1)
\ No newline at end of file
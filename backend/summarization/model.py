@@ -1,8 +1,7 @@
 import torch
 from torch import nn
-from transformers import T5Tokenizer, T5ForConditionalGeneration
+from transformers import T5TokenizerFast, T5ForConditionalGeneration
 import os
-import math
 
 # Set device
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -10,29 +9,12 @@ print(f"Using device: {device}")
 
 # Custom Model Wrapper
 class CustomEncoderDecoderSummarizer(nn.Module):
-    def __init__(self, pretrained_model_name="t5-base", d_model=768):
+    def __init__(self, t5_model: T5ForConditionalGeneration, d_model=768):
         super().__init__()
-        self.t5 = T5ForConditionalGeneration.from_pretrained(pretrained_model_name)
-        self.encoder = self.t5.encoder
-        self.decoder = self.t5.decoder
+        self.t5 = t5_model
         self.d_model = d_model
-        self.fc = nn.Linear(self.encoder.config.d_model, d_model)
-        self.positional_encoding = self._get_positional_encoding(d_model)
-
-    def _get_positional_encoding(self, d_model, max_len=512):
-        pos_encoding = torch.zeros(max_len, d_model)
-        for pos in range(max_len):
-            for i in range(0, d_model, 2):
-                pos_encoding[pos, i] = math.sin(pos / (10000 ** (i / d_model)))
-                if i + 1 < d_model:
-                    pos_encoding[pos, i + 1] = math.cos(pos / (10000 ** (i / d_model)))
-        return pos_encoding
 
     def forward(self, input_ids, decoder_input_ids=None, attention_mask=None, labels=None):
-        encoder_outputs = self.encoder(input_ids=input_ids, attention_mask=attention_mask)
-        encoder_hidden_states = encoder_outputs.last_hidden_state
-        # encoder_hidden_states = self.fc(encoder_hidden_states) + self.positional_encoding[:encoder_hidden_states.size(1), :].to(device)
-
         return self.t5(
             input_ids=input_ids,
             attention_mask=attention_mask,
@@ -45,7 +27,8 @@ class CustomEncoderDecoderSummarizer(nn.Module):
         try:
             # Load the model state dict
             state_dict = torch.load(model_path, map_location=device)
-            self.load_state_dict(state_dict)
+            # strict=False: older checkpoints still carry the removed fc/encoder/decoder keys
+            self.load_state_dict(state_dict, strict=False)
             self.eval()  # Set to evaluation mode
             print(f"Successfully loaded model from {model_path}")
             return True
@@ -64,7 +47,7 @@ def generate_summary(model, tokenizer, text, max_input_length=512, max_output_le
         truncation=True
     ).to(device)
 
-    with torch.no_grad():
+    with torch.inference_mode():
         summary_ids = model.t5.generate(
             input_ids=input_ids,
             max_length=max_output_length,
@@ -98,10 +81,11 @@ class SummarizerModel:
             try:
                 print("Initializing summarizer model...")
                 # Load tokenizer
-                self._tokenizer = T5Tokenizer.from_pretrained(tokenizer_path if os.path.exists(tokenizer_path) else "t5-base")
+                self._tokenizer = T5TokenizerFast.from_pretrained(tokenizer_path if os.path.exists(tokenizer_path) else "t5-base")
                 
                 # Load model
-                self._model = CustomEncoderDecoderSummarizer().to(device)
+                t5_model = T5ForConditionalGeneration.from_pretrained("t5-base")
+                self._model = CustomEncoderDecoderSummarizer(t5_model).to(device)
                 
                 # Use absolute path for consistent loading
                 absolute_path = "c:/Users/eshwa/OneDrive/Pictures/content/RAW/models/summary_model/model_weight.pth"